@@ -0,0 +1,236 @@
+import asyncio
+import json
+import os
+import threading
+from itertools import groupby
+
+from config import settings
+
+# Confidence bins used to calibrate the cheap model's self-reported confidence
+_CALIBRATION_BINS = 5
+
+
+class ConfidenceCalibrator:
+    """Histogram-binning calibration of raw LLM confidence to observed accuracy"""
+
+    def __init__(self, bins: list[tuple[int, int]] | None = None):
+        # (correct, total) per confidence bin
+        self.bins = bins or [(0, 0)] * _CALIBRATION_BINS
+
+    @staticmethod
+    def _bin(confidence: float) -> int:
+        confidence = min(max(confidence, 0.0), 1.0)
+        return min(int(confidence * _CALIBRATION_BINS), _CALIBRATION_BINS - 1)
+
+    @classmethod
+    def fit(cls, records: list[dict]) -> "ConfidenceCalibrator":
+        bins = [[0, 0] for _ in range(_CALIBRATION_BINS)]
+        for record in records:
+            index = cls._bin(record["confidence"])
+            bins[index][0] += int(record["correct"])
+            bins[index][1] += 1
+        return cls([(correct, total) for correct, total in bins])
+
+    def calibrate(self, confidence: float) -> float:
+        correct, total = self.bins[self._bin(confidence)]
+        if not total:
+            return confidence
+        # Laplace smoothing keeps sparse bins from snapping to 0 or 1
+        return (correct + 1) / (total + 2)
+
+
+def tune_thresholds(
+    records: list[dict],
+    calibrator: ConfidenceCalibrator,
+    target_precision: float | None = None,
+) -> dict[str, float]:
+    """Pick the lowest calibrated confidence per intent that meets the target precision
+
+    ``records`` hold the cheap model's ``intent``, raw ``confidence`` and whether it
+    was ``correct`` against the labelled scenario.
+    """
+    target_precision = target_precision or settings.CASCADE_TARGET_PRECISION
+
+    by_intent: dict[str, list[tuple[float, bool]]] = {}
+    for record in records:
+        by_intent.setdefault(record["intent"], []).append(
+            (calibrator.calibrate(record["confidence"]), bool(record["correct"]))
+        )
+
+    thresholds = {}
+    for intent, samples in by_intent.items():
+        samples.sort(key=lambda sample: sample[0], reverse=True)
+        threshold = 1.01  # Always escalate unless some threshold is precise enough
+        correct = accepted = 0
+        # A threshold accepts every sample sharing its calibrated confidence, so
+        # precision is only checked once a whole group of equal values is counted
+        for confidence, group in groupby(samples, key=lambda sample: sample[0]):
+            outcomes = [is_correct for _, is_correct in group]
+            accepted += len(outcomes)
+            correct += sum(outcomes)
+            if correct / accepted >= target_precision:
+                threshold = confidence
+        # Not rounded: rounding up would escalate the very bin the threshold came from
+        thresholds[intent] = threshold
+    return thresholds
+
+
+class CascadeStats:
+    """Escalation rate and end-to-end latency per intent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._intents: dict[str, dict] = {}
+
+    def record(self, intent: str, escalated: bool, latency_ms: float) -> None:
+        with self._lock:
+            stats = self._intents.setdefault(
+                intent,
+                {
+                    "requests": 0,
+                    "escalations": 0,
+                    "latencyMsTotal": 0.0,
+                    "cheapLatencyMsTotal": 0.0,
+                    "escalatedLatencyMsTotal": 0.0,
+                },
+            )
+            stats["requests"] += 1
+            stats["latencyMsTotal"] += latency_ms
+            if escalated:
+                stats["escalations"] += 1
+                stats["escalatedLatencyMsTotal"] += latency_ms
+            else:
+                stats["cheapLatencyMsTotal"] += latency_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            intents = {
+                intent: self._summarize(stats)
+                for intent, stats in self._intents.items()
+            }
+            overall = self._summarize(
+                {
+                    key: sum(stats[key] for stats in self._intents.values())
+                    for key in (
+                        "requests",
+                        "escalations",
+                        "latencyMsTotal",
+                        "cheapLatencyMsTotal",
+                        "escalatedLatencyMsTotal",
+                    )
+                }
+            )
+        return {"overall": overall, "intents": intents}
+
+    @staticmethod
+    def _summarize(stats: dict) -> dict:
+        requests = stats["requests"]
+        escalations = stats["escalations"]
+        cheap = requests - escalations
+        return {
+            "requests": requests,
+            "escalations": escalations,
+            "escalationRate": round(escalations / requests, 4) if requests else 0.0,
+            "avgLatencyMs": round(stats["latencyMsTotal"] / requests)
+            if requests
+            else 0,
+            "avgCheapLatencyMs": round(stats["cheapLatencyMsTotal"] / cheap)
+            if cheap
+            else 0,
+            "avgEscalatedLatencyMs": round(
+                stats["escalatedLatencyMsTotal"] / escalations
+            )
+            if escalations
+            else 0,
+        }
+
+
+class CascadePolicy:
+    """Decide when a cheap-model classification must be escalated to the strong model"""
+
+    def __init__(
+        self,
+        thresholds: dict[str, float] | None = None,
+        calibrator: ConfidenceCalibrator | None = None,
+        default_threshold: float | None = None,
+        high_risk_intents: set[str] | None = None,
+    ):
+        self.thresholds = thresholds or {}
+        self.calibrator = calibrator or ConfidenceCalibrator()
+        self.default_threshold = default_threshold or settings.CASCADE_DEFAULT_THRESHOLD
+        self.high_risk_intents = (
+            high_risk_intents
+            if high_risk_intents is not None
+            else set(settings.CASCADE_HIGH_RISK_INTENTS)
+        )
+        self.stats = CascadeStats()
+
+    @classmethod
+    def load(cls, path: str | None = None) -> "CascadePolicy":
+        """Load tuned thresholds and calibration, falling back to defaults"""
+        path = path or settings.CASCADE_THRESHOLDS_PATH
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            thresholds=data.get("thresholds", {}),
+            calibrator=ConfidenceCalibrator(
+                [tuple(b) for b in data["calibration_bins"]]
+            )
+            if data.get("calibration_bins")
+            else None,
+        )
+
+    def calibrate(self, confidence: float) -> float:
+        return self.calibrator.calibrate(confidence)
+
+    def threshold(self, intent: str) -> float:
+        return self.thresholds.get(intent, self.default_threshold)
+
+    def should_escalate(self, intent: str, calibrated_confidence: float) -> bool:
+        if intent in self.high_risk_intents:
+            return True
+        return calibrated_confidence < self.threshold(intent)
+
+
+async def run_tuning(runs: int = 3, path: str | None = None) -> dict:
+    """Classify the labelled scenarios with the cheap tier and write tuned thresholds"""
+    from classifier import IntentClassifier
+
+    with open("mock_scenarios.json", encoding="utf-8") as f:
+        scenarios = json.load(f)["scenarios"]
+
+    classifier = IntentClassifier(cascade=False)
+    records = []
+    for _ in range(runs):
+        for scenario in scenarios:
+            result = await classifier.classify_with_llm(scenario["input"])
+            if result.model is None:
+                continue  # Fallback results say nothing about the cheap model
+            records.append(
+                {
+                    "intent": result.intent,
+                    "confidence": result.confidence,
+                    "correct": result.intent == scenario["expected_intent"],
+                }
+            )
+
+    calibrator = ConfidenceCalibrator.fit(records)
+    data = {
+        "thresholds": tune_thresholds(records, calibrator),
+        "calibration_bins": [list(b) for b in calibrator.bins],
+        "samples": len(records),
+    }
+    with open(path or settings.CASCADE_THRESHOLDS_PATH, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+if __name__ == "__main__":
+    tuned = asyncio.run(run_tuning())
+    print(
+        f"Tuned {len(tuned['thresholds'])} intent thresholds from {tuned['samples']} samples"
+    )
+    for intent, threshold in sorted(tuned["thresholds"].items()):
+        print(f"  {intent}: {threshold}")
@@ -1,15 +1,23 @@
+import asyncio
 import json
 import time
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
+from cascade import CascadePolicy
 from config import settings
+from deadline import Deadline, DeadlineStats
+from logging_config import get_logger
 from models import ClassificationResult, TraditionalNLPResult
+from router import ModelRouter
+from taxonomy import Taxonomy, TaxonomyStore
+
+logger = get_logger(__name__)
 
 
 class IntentClassifier:
-    def __init__(self):
-        self.client = OpenAI(
+    def __init__(self, cascade: bool | None = None):
+        self.client = AsyncOpenAI(
             base_url=settings.OPENROUTER_BASE_URL,
             api_key=settings.OPENROUTER_API_KEY,
             default_headers={
@@ -17,6 +25,16 @@ class IntentClassifier:
                 "X-Title": "Peitho Backend",
             },
         )
+        self.router = ModelRouter()
+
+        if cascade is None:
+            cascade = settings.CASCADE_ENABLED
+        self.cascade = CascadePolicy.load() if cascade else None
+        self.strong_router = (
+            ModelRouter(models=settings.CASCADE_STRONG_MODELS) if cascade else None
+        )
+        self.deadline_stats = DeadlineStats()
+        self.taxonomy = TaxonomyStore()
 
     def simulate_traditional_nlp(self, text: str) -> TraditionalNLPResult:
         """Simulate traditional NLP system - shows limitations"""
@@ -45,38 +63,138 @@ class IntentClassifier:
             issues="Cannot handle multilingual input or understand context",
         )
 
-    def classify_with_llm(self, text: str) -> ClassificationResult:
-        """Classify using LLM with proper error handling"""
+    async def classify_with_llm(
+        self,
+        text: str,
+        family: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> ClassificationResult:
+        """Classify using LLM with proper error handling
+
+        ``family`` is a coarse intent hint used by the sticky routing policy.
+        ``deadline`` bounds the LLM timeout, model choice and cascade escalation;
+        when too little budget remains the rule-based fallback is used directly.
+        The taxonomy is snapshotted once, so a concurrent reload never changes it
+        mid-request.
+        """
+        taxonomy = self.taxonomy.current()
+        if deadline is not None:
+            self.deadline_stats.increment("requestsWithDeadline")
+
+        if self.cascade is not None:
+            result = await self._classify_cascade(text, taxonomy, family, deadline)
+        else:
+            result = await self._classify_single(
+                text, self.router, taxonomy, family, deadline
+            )
+
+        if deadline is not None and deadline.expired():
+            self.deadline_stats.increment("lateResponses")
+        return result
+
+    async def _classify_cascade(
+        self,
+        text: str,
+        taxonomy: Taxonomy,
+        family: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> ClassificationResult:
+        """Cheap model first, escalating to the strong model when unsure or high-risk"""
         start_time = time.time()
 
-        try:
-            response = self.client.chat.completions.create(
-                model=settings.OPENROUTER_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"""You are an expert intent classifier for Hong Kong bank customer service.
-
-Classify customer inquiries into these intents:
-{json.dumps(settings.INTENT_DEFINITIONS, indent=2)}
-
-Respond ONLY with valid JSON in this exact format:
-{{
-  "intent": "intent_key",
-  "confidence": 0.85,
-  "reasoning": "Brief explanation"
-}}""",
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Classify this Hong Kong bank inquiry: {text}",
-                    },
-                ],
-                temperature=0.1,
-                max_tokens=200,
+        result = await self._classify_single(
+            text, self.router, taxonomy, family, deadline
+        )
+        # Thresholds, high-risk intents and stats are all keyed on the cheap answer
+        cheap_intent = result.intent
+        confidence = self.cascade.calibrate(result.confidence)
+        escalated = self.cascade.should_escalate(cheap_intent, confidence)
+
+        if escalated and deadline is not None:
+            remaining_ms = deadline.remaining_ms()
+            if remaining_ms < settings.MIN_LLM_BUDGET_MS or (
+                remaining_ms < self.strong_router.fastest_latency_ms()
+                and self.strong_router.probe(remaining_ms, claim=False) is None
+            ):
+                self.deadline_stats.increment("escalationsSkipped")
+                escalated = False
+
+        # The calibration is fitted on the cheap model, so it only describes its answer
+        update = {"calibratedConfidence": confidence}
+        if escalated:
+            strong = await self._classify_single(
+                text, self.strong_router, taxonomy, family, deadline
             )
+            # Keep the cheap answer if the strong model failed and fell back
+            if strong.model is not None or result.model is None:
+                result = strong
+                update = {}
+
+        latency = int((time.time() - start_time) * 1000)
+        self.cascade.stats.record(cheap_intent, escalated, latency)
+
+        return result.model_copy(
+            update={**update, "latency": str(latency), "escalated": escalated}
+        )
+
+    async def _classify_single(
+        self,
+        text: str,
+        router: ModelRouter,
+        taxonomy: Taxonomy,
+        family: str | None = None,
+        deadline: Deadline | None = None,
+    ) -> ClassificationResult:
+        """Classify with a single model picked by ``router``"""
+        client = self.client
+        model = None
+        timeout = None
+        if deadline is not None:
+            budget_ms = deadline.remaining_ms()
+            if budget_ms >= settings.MIN_LLM_BUDGET_MS:
+                if budget_ms >= router.fastest_latency_ms():
+                    model = router.choose(family, budget_ms=budget_ms)
+                else:
+                    # No model fits the budget; a due probe still tries one so
+                    # profiles keep updating and a recovered provider is noticed
+                    model = router.probe(budget_ms)
+            if model is None:
+                self.deadline_stats.increment("budgetFallbacks")
+                return self._fallback_classification(
+                    text,
+                    "0",
+                    f"Deadline budget {budget_ms:.0f}ms too small for LLM call",
+                    taxonomy,
+                )
+            # httpx timeouts apply per phase, so the budget is enforced around the
+            # whole call instead; retries would overrun it anyway
+            client = self.client.with_options(max_retries=0)
+            timeout = deadline.remaining_seconds()
+        else:
+            model = router.choose(family)
+        start_time = time.time()
+        response = None
+
+        try:
+            async with asyncio.timeout(timeout):
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": taxonomy.system_prompt,
+                        },
+                        {
+                            "role": "user",
+                            "content": f"Classify this Hong Kong bank inquiry: {text}",
+                        },
+                    ],
+                    temperature=0.1,
+                    max_tokens=200,
+                )
 
             latency = int((time.time() - start_time) * 1000)
+            router.record(model, latency, usage=response.usage)
 
             # Parse JSON response
             response_text = response.choices[0].message.content.strip()
@@ -85,7 +203,7 @@ Respond ONLY with valid JSON in this exact format:
             if response_text.startswith("```"):
                 response_text = response_text.split("```")[1]
                 if response_text.startswith("json"):
-                    response_text = response_text.substring(4)
+                    response_text = response_text[4:]
 
             result = json.loads(response_text)
 
@@ -94,69 +212,105 @@ Respond ONLY with valid JSON in this exact format:
                 confidence=result.get("confidence", 0.3),
                 reasoning=result.get("reasoning", "Classification completed"),
                 latency=str(latency),
+                model=model,
+                taxonomyVersion=taxonomy.version,
+            )
+
+        except asyncio.CancelledError:
+            # Caller went away; whatever the upstream already spent is wasted
+            self.deadline_stats.increment(
+                "upstreamCancelled", wasted_ms=(time.time() - start_time) * 1000
+            )
+            raise
+
+        except TimeoutError:
+            # The caller's deadline cut the call short: not a provider failure,
+            # and the elapsed time is only a lower bound on the model's latency
+            latency = int((time.time() - start_time) * 1000)
+            router.record_cutoff(model, latency)
+            self.deadline_stats.increment("upstreamTimeouts", wasted_ms=latency)
+            logger.warning(
+                "LLM call cut off by deadline", model=model, latency_ms=latency
+            )
+            return self._fallback_classification(
+                text, str(latency), "Deadline exceeded", taxonomy
             )
 
         except Exception as error:
             latency = int((time.time() - start_time) * 1000)
+            if response is None:
+                router.record(model, latency, error=True)
 
             # Enhanced error logging
-            print(f"LLM API error: {error}")
+            logger.error("LLM API error", model=model, error=str(error))
 
             # Provide fallback classification with error context
-            return self._fallback_classification(text, str(latency), str(error))
+            return self._fallback_classification(
+                text, str(latency), str(error), taxonomy
+            )
 
     def _fallback_classification(
-        self, text: str, latency: str, error: str
+        self, text: str, latency: str, error: str, taxonomy: Taxonomy | None = None
     ) -> ClassificationResult:
-        """Enhanced fallback for when API fails"""
-        if "過咗身" in text or "過世" in text:
-            return ClassificationResult(
-                intent="deceased_account_services",
-                confidence=0.95,
-                reasoning="Customer mentioned bereavement, needs specialized support",
-                latency=latency,
-            )
-
-        if "supervisor" in text or "經理" in text or "transfer畀supervisor" in text:
-            return ClassificationResult(
-                intent="escalation_to_supervisor",
-                confidence=0.92,
-                reasoning="Multiple failed attempts with polite frustration indicates escalation need",
-                latency=latency,
-            )
-
-        if "crypto" in text or "virtual asset" in text or "金管局" in text:
-            return ClassificationResult(
-                intent="regulatory_compliance_crypto",
-                confidence=0.88,
-                reasoning="HKMA regulatory concern about cryptocurrency",
-                latency=latency,
-            )
-
-        if "P按轉H按" in text or "HIBOR" in text or "prime rate" in text:
-            return ClassificationResult(
-                intent="mortgage_refinance_hibor_prime",
-                confidence=0.89,
-                reasoning="Technical mortgage refinancing request with rate cap concerns",
-                latency=latency,
-            )
-
-        if "overdue" in text or "交咗錢" in text or "already" in text:
-            return ClassificationResult(
-                intent="payment_dispute_escalation",
-                confidence=0.87,
-                reasoning="Payment dispute with frustration, needs escalation",
-                latency=latency,
-            )
+        """Enhanced fallback for when API fails
+
+        Rules for intents missing from the active taxonomy are skipped.
+        """
+        taxonomy = taxonomy or self.taxonomy.current()
+        for keywords, intent, confidence, reasoning in FALLBACK_RULES:
+            if intent in taxonomy.intents and any(k in text for k in keywords):
+                return ClassificationResult(
+                    intent=intent,
+                    confidence=confidence,
+                    reasoning=reasoning,
+                    latency=latency,
+                    taxonomyVersion=taxonomy.version,
+                )
 
         return ClassificationResult(
             intent="insufficient_context",
             confidence=0.3,
             reasoning=f"Unable to determine specific intent. API Error: {error}",
             latency=latency,
+            taxonomyVersion=taxonomy.version,
         )
 
 
+# Keyword rules for the fallback classifier: (keywords, intent, confidence, reasoning)
+FALLBACK_RULES = [
+    (
+        ("過咗身", "過世"),
+        "deceased_account_services",
+        0.95,
+        "Customer mentioned bereavement, needs specialized support",
+    ),
+    (
+        ("supervisor", "經理", "transfer畀supervisor"),
+        "escalation_to_supervisor",
+        0.92,
+        "Multiple failed attempts with polite frustration indicates escalation need",
+    ),
+    (
+        ("crypto", "virtual asset", "金管局"),
+        "regulatory_compliance_crypto",
+        0.88,
+        "HKMA regulatory concern about cryptocurrency",
+    ),
+    (
+        ("P按轉H按", "HIBOR", "prime rate"),
+        "mortgage_refinance_hibor_prime",
+        0.89,
+        "Technical mortgage refinancing request with rate cap concerns",
+    ),
+    (
+        ("overdue", "交咗錢", "already"),
+        "payment_dispute_escalation",
+        0.87,
+        "Payment dispute with frustration, needs escalation",
+    ),
+]
+
+
 # Emerging intents data for discovery endpoint
 UNCLASSIFIED_QUERIES = [
     "你哋有冇做digital yuan debit card？我想用嚟喺大陸消費",
@@ -172,11 +326,14 @@ UNCLASSIFIED_QUERIES = [
 ]
 
 
-def analyze_emerging_intents(classifier: IntentClassifier) -> list:
+async def analyze_emerging_intents(classifier: IntentClassifier) -> list:
     """Analyze unclassified queries to identify emerging patterns"""
+    # Discovery prompts are much larger than classification ones, so they are
+    # routed but not folded into the per-model latency profiles
+    model = classifier.router.choose()
     try:
-        response = classifier.client.chat.completions.create(
-            model=settings.OPENROUTER_MODEL,
+        response = await classifier.client.chat.completions.create(
+            model=model,
             messages=[
                 {
                     "role": "system",
@@ -216,5 +373,5 @@ Respond in JSON format with an array of emerging intents.""",
         return json.loads(response_text)
 
     except Exception as error:
-        print(f"Intent discovery error: {error}")
+        logger.error("Intent discovery error", model=model, error=str(error))
         raise Exception(f"Intent discovery failed: {str(error)}")
@@ -10,12 +10,71 @@ class Settings:
     # OpenRouter API configuration
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "")
     OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
-    OPENROUTER_MODEL: str = "z-ai/glm-4.5-air"
+
+    # Model routing configuration
+    OPENROUTER_MODELS: list = [
+        model.strip()
+        for model in os.getenv(
+            "OPENROUTER_MODELS", "z-ai/glm-4.5-air,anthropic/claude-3-haiku"
+        ).split(",")
+        if model.strip()
+    ]
+    ROUTING_POLICY: str = os.getenv("ROUTING_POLICY", "cheapest_within_slo")
+    LATENCY_SLO_MS: int = int(os.getenv("LATENCY_SLO_MS", "1500"))
+    ROUTER_MAX_ERROR_RATE: float = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.2"))
+    ROUTER_EWMA_ALPHA: float = 0.2
+    ROUTER_PROBE_INTERVAL_SECONDS: int = 30
+
+    # Two-stage cascade: cheap routed models first, strong model on low confidence
+    CASCADE_ENABLED: bool = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+    CASCADE_STRONG_MODELS: list = [
+        model.strip()
+        for model in os.getenv(
+            "CASCADE_STRONG_MODELS", "anthropic/claude-3.5-sonnet"
+        ).split(",")
+        if model.strip()
+    ]
+    CASCADE_DEFAULT_THRESHOLD: float = float(
+        os.getenv("CASCADE_DEFAULT_THRESHOLD", "0.7")
+    )
+    CASCADE_TARGET_PRECISION: float = 0.9
+    CASCADE_THRESHOLDS_PATH: str = os.getenv(
+        "CASCADE_THRESHOLDS_PATH", "cascade_thresholds.json"
+    )
+    CASCADE_HIGH_RISK_INTENTS: list = [
+        "fraud_verification_urgent",
+        "escalation_to_supervisor",
+        "security_lockout_escalation",
+    ]
+
+    # Request deadlines
+    # Below this remaining budget the rule-based fallback is used without an LLM call
+    MIN_LLM_BUDGET_MS: int = int(os.getenv("MIN_LLM_BUDGET_MS", "200"))
+    HEALTH_CHECK_TIMEOUT_MS: int = int(os.getenv("HEALTH_CHECK_TIMEOUT_MS", "5000"))
+    DISCONNECT_POLL_SECONDS: float = 0.05
+
+    # USD per 1M tokens (prompt, completion)
+    MODEL_PRICING = {
+        "z-ai/glm-4.5-air": (0.20, 1.10),
+        "anthropic/claude-3-haiku": (0.25, 1.25),
+        "openai/gpt-4o-mini": (0.15, 0.60),
+        "anthropic/claude-3.5-sonnet": (3.00, 15.00),
+    }
 
     # API configuration
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("PORT", os.getenv("API_PORT", "8000")))
 
+    # Logging configuration
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Share of high-volume info events that are kept (1.0 keeps all)
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    LOG_SAMPLED_EVENTS: set = {
+        "Processing classification request",
+        "Classification completed",
+    }
+
     # CORS configuration
     CORS_ORIGINS: list = [
         "http://localhost:3000",
@@ -25,25 +84,12 @@ class Settings:
         "https://peitho-demo.vercel.app",
     ]
 
-    # Intent definitions for Hong Kong banking
-    INTENT_DEFINITIONS = {
-        "payment_dispute_escalation": "Customer reporting payment processing errors requiring immediate resolution",
-        "escalation_to_supervisor": "Request for supervisor intervention due to unresolved issues",
-        "passbook_fixed_deposit_inquiry": "Questions about traditional banking products (passbooks, fixed deposits)",
-        "mortgage_refinance_hibor_prime": "Mortgage refinancing between HIBOR and Prime rate products",
-        "deceased_account_services": "Account handling for deceased customers",
-        "debit_card_application": "Application for ATM/debit card (not credit card)",
-        "securities_margin_trading": "Stock trading with margin facilities",
-        "security_lockout_escalation": "Multiple security-related failures requiring urgent attention",
-        "wealth_management_trust_services": "High net worth services including trusts and estate planning",
-        "regulatory_compliance_crypto": "Questions about cryptocurrency regulations and compliance",
-        "remittance_limit_mainland": "Cross-border transfer limits to mainland China",
-        "investment_linked_insurance_surrender": "ILAS product surrender and valuation",
-        "sme_emergency_credit_facility": "Urgent business credit line requests",
-        "fraud_verification_urgent": "Potential fraud in progress requiring immediate verification",
-        "mpf_consolidation": "Mandatory Provident Fund scheme transfers",
-        "insufficient_context": "Query too vague or lacks sufficient context for classification",
-    }
+    # Intent taxonomy: versioned file, hot-reloaded on change or via admin endpoint
+    TAXONOMY_PATH: str = os.getenv("TAXONOMY_PATH", "taxonomy.json")
+    TAXONOMY_WATCH: bool = os.getenv("TAXONOMY_WATCH", "true").lower() == "true"
+    TAXONOMY_POLL_SECONDS: float = 2.0
+    # Required in the X-Admin-Token header for admin endpoints when set
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
 
     @classmethod
     def validate_environment(cls) -> bool:
@@ -0,0 +1,65 @@
+import math
+import threading
+import time
+
+
+class Deadline:
+    """Absolute deadline for a request, created from a remaining budget in ms"""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self._expires_at = time.monotonic() + budget_ms / 1000
+
+    @classmethod
+    def from_request(
+        cls, header_ms: str | None, field_ms: float | None
+    ) -> "Deadline | None":
+        """Build a deadline from the header and/or body field, keeping the tighter one
+
+        Raises ``ValueError`` for budgets that are not finite, non-negative numbers.
+        """
+        budgets = []
+        for value in (field_ms, header_ms):
+            if value is None or value == "":
+                continue
+            budget = float(value)
+            if not math.isfinite(budget) or budget < 0:
+                raise ValueError(f"Invalid deadline budget: {value!r}")
+            budgets.append(budget)
+        if not budgets:
+            return None
+        return cls(min(budgets))
+
+    def remaining_ms(self) -> float:
+        return max((self._expires_at - time.monotonic()) * 1000, 0.0)
+
+    def remaining_seconds(self) -> float:
+        return self.remaining_ms() / 1000
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+
+class DeadlineStats:
+    """Counts of upstream work skipped, cut short or wasted because of deadlines"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {
+            "requestsWithDeadline": 0,
+            "budgetFallbacks": 0,
+            "escalationsSkipped": 0,
+            "upstreamTimeouts": 0,
+            "upstreamCancelled": 0,
+            "lateResponses": 0,
+            "wastedUpstreamMs": 0,
+        }
+
+    def increment(self, counter: str, wasted_ms: float = 0) -> None:
+        with self._lock:
+            self._counts[counter] += 1
+            self._counts["wastedUpstreamMs"] += int(wasted_ms)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
@@ -5,6 +5,9 @@ from dataclasses import dataclass
 
 from openai import OpenAI
 
+from router import ModelRouter
+from taxonomy import load_taxonomy
+
 
 @dataclass
 class ClassificationResult:
@@ -23,23 +26,9 @@ class IntentClassifier:
                 base_url="https://openrouter.ai/api/v1",
                 api_key=os.getenv("OPENROUTER_API_KEY"),
             )
-        self.intent_definitions = {
-            "payment_dispute_escalation": "Customer reporting payment processing errors requiring immediate resolution",
-            "escalation_to_supervisor": "Request for supervisor intervention due to unresolved issues",
-            "passbook_fixed_deposit_inquiry": "Questions about traditional banking products (passbooks, fixed deposits)",
-            "mortgage_refinance_hibor_prime": "Mortgage refinancing between HIBOR and Prime rate products",
-            "deceased_account_services": "Account handling for deceased customers",
-            "debit_card_application": "Application for ATM/debit card (not credit card)",
-            "securities_margin_trading": "Stock trading with margin facilities",
-            "security_lockout_escalation": "Multiple security-related failures requiring urgent attention",
-            "wealth_management_trust_services": "High net worth services including trusts and estate planning",
-            "regulatory_compliance_crypto": "Questions about cryptocurrency regulations and compliance",
-            "remittance_limit_mainland": "Cross-border transfer limits to mainland China",
-            "investment_linked_insurance_surrender": "ILAS product surrender and valuation",
-            "sme_emergency_credit_facility": "Urgent business credit line requests",
-            "fraud_verification_urgent": "Potential fraud in progress requiring immediate verification",
-            "mpf_consolidation": "Mandatory Provident Fund scheme transfers",
-        }
+            self.router = ModelRouter()
+        # Share the versioned taxonomy file with the API instead of a local copy
+        self.intent_definitions = load_taxonomy().intents
 
     def classify_with_llm(self, text: str) -> ClassificationResult:
         """Classify using real LLM or mock for demo purposes"""
@@ -61,9 +50,12 @@ class IntentClassifier:
 
     def _real_llm_response(self, text: str) -> dict:
         """Make actual API call to OpenRouter"""
+        model = self.router.choose()
+        start = time.time()
+        response = None
         try:
             response = self.client.chat.completions.create(
-                model="anthropic/claude-3-haiku",  # Fast and cost-effective for demo
+                model=model,
                 messages=[
                     {
                         "role": "system",
@@ -87,6 +79,7 @@ Respond ONLY with valid JSON in this exact format:
                 temperature=0.1,
                 max_tokens=200,
             )
+            self.router.record(model, (time.time() - start) * 1000, response.usage)
 
             # Parse JSON response
             response_text = response.choices[0].message.content.strip()
@@ -99,6 +92,8 @@ Respond ONLY with valid JSON in this exact format:
             return json.loads(response_text)
 
         except Exception as e:
+            if response is None:
+                self.router.record(model, (time.time() - start) * 1000, error=True)
             print(f"LLM API error: {e}")
             # Fallback to mock response
             return self._mock_llm_response(text)
@@ -129,7 +124,7 @@ Respond ONLY with valid JSON in this exact format:
         # Add more patterns...
 
         return {
-            "intent": "general_inquiry",
+            "intent": "insufficient_context",
             "confidence": 0.4,
             "reasoning": "Unable to determine specific intent",
         }
@@ -144,7 +139,7 @@ def run_demo(use_real_llm=None):
         use_real_llm = bool(os.getenv("OPENROUTER_API_KEY"))
 
     if use_real_llm:
-        print("🤖 Using real LLM via OpenRouter (Claude Haiku)")
+        print("🤖 Using real LLM via OpenRouter (routed across OPENROUTER_MODELS)")
     else:
         print("🎭 Using mock responses (set OPENROUTER_API_KEY to use real LLM)")
     print()
@@ -1,31 +1,231 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import threading
 from typing import Any
 
 import structlog
 
+from config import settings
+
+# Sentinel that tells the writer thread to flush and exit
+_STOP = object()
+
+# Maximum number of queued events written in a single batch
+_WRITE_BATCH_SIZE = 256
+
+
+class QueueLogger:
+    """structlog logger that hands event dicts to the background writer
+
+    Rendering and stdout writes happen on the writer thread, so the calling
+    thread only pays for a non-blocking queue put. When the queue is full the
+    event is dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, writer: "_LogWriter", *args: Any):
+        self._writer = writer
+
+    def msg(self, **event_dict: Any) -> None:
+        try:
+            self._writer.queue.put_nowait(event_dict)
+        except queue.Full:
+            self._writer.dropped += 1
+
+    log = debug = info = warn = warning = error = critical = exception = fatal = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, writer: "_LogWriter"):
+        self._writer = writer
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self._writer, *args)
+
+
+class _LogWriter(threading.Thread):
+    """Background thread that renders queued events and writes them to stdout"""
+
+    def __init__(self, log_queue: queue.Queue, renderer: Any):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self._renderer = renderer
+        self.dropped = 0
+        self._reported_dropped = 0
+
+    def run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < _WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            stopping = False
+            for event_dict in batch:
+                if event_dict is _STOP:
+                    stopping = True
+                    continue
+                try:
+                    lines.append(self._render(event_dict))
+                except Exception as error:  # Never let a bad event kill the writer
+                    lines.append(f"log render error: {error}")
+
+            if self.dropped > self._reported_dropped:
+                lines.append(
+                    self._render(
+                        {
+                            "event": "Log events dropped",
+                            "level": "warning",
+                            "dropped": self.dropped - self._reported_dropped,
+                        }
+                    )
+                )
+                self._reported_dropped = self.dropped
+
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+
+            if stopping:
+                return
+
+    def _render(self, event_dict: dict) -> str:
+        return self._renderer(None, event_dict.get("level", "info"), event_dict)
+
+    def stop(self) -> None:
+        self.queue.put(_STOP)
+        self.join(timeout=2)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler for stdlib loggers that leaves formatting to the listener
+
+    The base class formats each record on the calling thread and strips its
+    args, which uvicorn's access formatter needs. Records never leave the
+    process, so they are queued as they are. When the queue is full the record
+    is dropped and counted with the structlog events.
+    """
+
+    def __init__(self, log_queue: queue.Queue, writer: _LogWriter):
+        super().__init__(log_queue)
+        self._writer = writer
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._writer.dropped += 1
+
+
+# uvicorn installs its own handlers on these with propagate=False
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.access")
+
+_writer: _LogWriter | None = None
+_listeners: list[logging.handlers.QueueListener] = []
+
+
+def sample_events(_: Any, method_name: str, event_dict: dict) -> dict:
+    """Drop a share of high-volume info/debug events at LOG_SAMPLE_RATE"""
+    if (
+        method_name in ("debug", "info")
+        and event_dict.get("event") in settings.LOG_SAMPLED_EVENTS
+        and random.random() >= settings.LOG_SAMPLE_RATE
+    ):
+        raise structlog.DropEvent
+    return event_dict
+
+
+def _renderer() -> Any:
+    if sys.stdout.isatty():
+        return structlog.dev.ConsoleRenderer()
+    return structlog.processors.JSONRenderer()
+
+
+def _queue_handlers(logger: logging.Logger, writer: _LogWriter) -> None:
+    """Move a stdlib logger's handlers behind a queue served by a listener thread"""
+    handlers = [
+        h for h in logger.handlers if not isinstance(h, logging.handlers.QueueHandler)
+    ]
+    if not handlers:
+        return
+    log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _listeners.append(listener)
+    logger.handlers = [_QueueHandler(log_queue, writer)]
+
+
+def configure_logging(async_mode: bool | None = None) -> None:
+    global _writer
+
+    if async_mode is None:
+        async_mode = settings.LOG_ASYNC
+
+    processors = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+        sample_events,
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+
+    if async_mode:
+        if _writer is None:
+            _writer = _LogWriter(queue.Queue(settings.LOG_QUEUE_SIZE), _renderer())
+            _writer.start()
+            atexit.register(_shutdown_logging)
+        # Tracebacks must be captured here: sys.exc_info() is empty on the writer
+        processors.append(structlog.processors.format_exc_info)
+        # No renderer in the chain: event dicts are rendered on the writer thread
+        logger_factory = QueueLoggerFactory(_writer)
+    else:
+        processors.append(_renderer())
+        logger_factory = structlog.PrintLoggerFactory()
 
-def configure_logging() -> None:
     structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer()
-            if sys.stdout.isatty()
-            else structlog.processors.JSONRenderer(),
-        ],
+        processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(20),  # INFO level
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
-        cache_logger_on_first_use=False,
+        logger_factory=logger_factory,
+        cache_logger_on_first_use=True,
     )
 
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=logging.INFO,
-    )
+    if async_mode:
+        root = logging.getLogger()
+        # Same rule as basicConfig: leave an already configured root alone
+        if not root.handlers:
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(logging.Formatter("%(message)s"))
+            root.addHandler(stream_handler)
+            root.setLevel(logging.INFO)
+            _queue_handlers(root, _writer)
+        # uvicorn's access log would otherwise write to stdout on the event loop
+        for name in _UVICORN_LOGGERS:
+            _queue_handlers(logging.getLogger(name), _writer)
+    else:
+        logging.basicConfig(
+            format="%(message)s",
+            stream=sys.stdout,
+            level=logging.INFO,
+        )
+
+
+def _shutdown_logging() -> None:
+    """Flush queued log events on interpreter exit"""
+    if _writer is not None:
+        _writer.stop()
+    for listener in _listeners:
+        listener.stop()
 
 
 def get_logger(name: str) -> structlog.BoundLogger:
@@ -1,20 +1,29 @@
+import asyncio
+import hmac
 from datetime import datetime
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from classifier import IntentClassifier, analyze_emerging_intents
 from config import settings
+from deadline import Deadline
 from logging_config import configure_logging, get_logger
 from models import (
+    CascadeResponse,
     ClassificationRequest,
     ClassificationResponse,
+    DeadlineStatsResponse,
     DiscoverResponse,
     EmergingIntent,
     HealthResponse,
+    ModelProfileInfo,
+    ModelRoutingResponse,
+    TaxonomyResponse,
 )
+from taxonomy import TaxonomyError
 
 configure_logging()
 logger = get_logger(__name__)
@@ -39,6 +48,32 @@ app.add_middleware(
 
 # Initialize classifier
 classifier = IntentClassifier()
+if settings.TAXONOMY_WATCH:
+    classifier.taxonomy.watch()
+
+# Non-standard status used when the client closed the connection first
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    """Raised when the caller hangs up before the work finishes"""
+
+
+async def run_until_disconnect(request: Request, coro):
+    """Await ``coro``, cancelling it (and its upstream call) if the client disconnects"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {task}, timeout=settings.DISCONNECT_POLL_SECONDS
+            )
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
 
 
 @app.get("/")
@@ -48,11 +83,15 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs",
         "health": "/health",
+        "models": "/models",
+        "cascade": "/cascade",
+        "deadlines": "/deadlines",
+        "taxonomy": "/taxonomy",
     }
 
 
 @app.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint with API connectivity test"""
     try:
         # Validate environment
@@ -72,14 +111,22 @@ async def health_check():
 
         # Test API connection with minimal request
         start_time = datetime.now()
-        test_result = classifier.classify_with_llm("Test")
+        test_result = await run_until_disconnect(
+            request,
+            classifier.classify_with_llm(
+                "Test", deadline=Deadline(settings.HEALTH_CHECK_TIMEOUT_MS)
+            ),
+        )
         latency = int((datetime.now() - start_time).total_seconds() * 1000)
+        # No model means the rule-based fallback answered: the call failed or
+        # was skipped for lack of budget, so connectivity was not confirmed
+        connected = test_result.model is not None
 
         return HealthResponse(
-            status="healthy",
+            status="healthy" if connected else "degraded",
             api={
-                "connected": True,
-                "model": settings.OPENROUTER_MODEL,
+                "connected": connected,
+                "model": test_result.model,
                 "latency": f"{latency}ms",
                 "response": test_result.intent,
             },
@@ -88,8 +135,12 @@ async def health_check():
                 "apiKeyFormat": "valid",
             },
             timestamp=datetime.now().isoformat(),
+            error=None if connected else test_result.reasoning,
         )
 
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
     except Exception as error:
         error_msg = str(error)
 
@@ -118,8 +169,16 @@ async def health_check():
 
 
 @app.post("/classify", response_model=ClassificationResponse)
-async def classify_intent(request: ClassificationRequest):
-    """Classify customer inquiry intent"""
+async def classify_intent(
+    request: ClassificationRequest,
+    http_request: Request,
+    x_deadline_ms: str | None = Header(default=None),
+):
+    """Classify customer inquiry intent
+
+    A remaining time budget can be passed in the ``X-Deadline-Ms`` header or the
+    ``deadlineMs`` field; the tighter of the two applies.
+    """
     try:
         if not request.text or not request.text.strip():
             logger.warning("Empty text input received")
@@ -128,19 +187,33 @@ async def classify_intent(request: ClassificationRequest):
         logger.info("Processing classification request", text_length=len(request.text))
 
         traditional = classifier.simulate_traditional_nlp(request.text)
-        llm = classifier.classify_with_llm(request.text)
+        try:
+            deadline = Deadline.from_request(x_deadline_ms, request.deadlineMs)
+        except ValueError as error:
+            raise HTTPException(status_code=422, detail=str(error)) from error
+        llm = await run_until_disconnect(
+            http_request,
+            classifier.classify_with_llm(
+                request.text, family=traditional.intent, deadline=deadline
+            ),
+        )
 
         logger.info(
             "Classification completed",
             llm_intent=llm.intent,
             llm_confidence=llm.confidence,
             latency=llm.latency,
+            model=llm.model,
+            escalated=llm.escalated,
         )
 
         return ClassificationResponse(traditional=traditional, llm=llm)
 
     except HTTPException:
         raise
+    except ClientDisconnected:
+        logger.info("Client disconnected, classification cancelled")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except Exception as error:
         logger.error("Classification failed", error=str(error))
         raise HTTPException(
@@ -148,11 +221,80 @@ async def classify_intent(request: ClassificationRequest):
         )
 
 
+@app.get("/models", response_model=ModelRoutingResponse)
+async def model_profiles():
+    """Live latency, error and cost profiles used for model routing"""
+    router = classifier.router
+    return ModelRoutingResponse(
+        policy=router.policy,
+        latencySloMs=router.latency_slo_ms,
+        profiles=[ModelProfileInfo(**profile) for profile in router.profiles()],
+        stickyAssignments=router.sticky_assignments(),
+    )
+
+
+@app.get("/cascade", response_model=CascadeResponse)
+async def cascade_stats():
+    """Cascade thresholds, escalation rate and end-to-end latency per intent"""
+    cascade = classifier.cascade
+    if cascade is None:
+        return CascadeResponse(enabled=False)
+
+    return CascadeResponse(
+        enabled=True,
+        defaultThreshold=cascade.default_threshold,
+        thresholds=cascade.thresholds,
+        highRiskIntents=sorted(cascade.high_risk_intents),
+        **cascade.stats.snapshot(),
+    )
+
+
+@app.get("/deadlines", response_model=DeadlineStatsResponse)
+async def deadline_stats():
+    """Upstream work skipped, cut short or wasted because of request deadlines"""
+    return DeadlineStatsResponse(**classifier.deadline_stats.snapshot())
+
+
+@app.get("/taxonomy", response_model=TaxonomyResponse)
+async def get_taxonomy():
+    """Active intent taxonomy version"""
+    taxonomy = classifier.taxonomy.current()
+    return TaxonomyResponse(
+        version=taxonomy.version,
+        fingerprint=taxonomy.fingerprint,
+        intents=taxonomy.intents,
+    )
+
+
+@app.post("/admin/taxonomy/reload", response_model=TaxonomyResponse)
+async def reload_taxonomy(x_admin_token: str | None = Header(default=None)):
+    """Reload the intent taxonomy from disk without restarting"""
+    if settings.ADMIN_TOKEN and not hmac.compare_digest(
+        (x_admin_token or "").encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    try:
+        # Rebuild off the event loop; requests keep using the current snapshot
+        taxonomy, reloaded = await asyncio.to_thread(classifier.taxonomy.reload)
+    except TaxonomyError as error:
+        raise HTTPException(
+            status_code=400, detail=f"Taxonomy reload failed: {str(error)}"
+        ) from error
+
+    return TaxonomyResponse(
+        version=taxonomy.version,
+        fingerprint=taxonomy.fingerprint,
+        intents=taxonomy.intents,
+        reloaded=reloaded,
+    )
+
+
 @app.get("/discover", response_model=DiscoverResponse)
 async def discover_emerging_intents():
     """Discover emerging intents from unclassified queries"""
     try:
-        emerging_intents_data = analyze_emerging_intents(classifier)
+        emerging_intents_data = await analyze_emerging_intents(classifier)
 
         # Convert to Pydantic models
         emerging_intents = []
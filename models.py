@@ -1,8 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ClassificationRequest(BaseModel):
     text: str
+    deadlineMs: float | None = Field(default=None, ge=0, allow_inf_nan=False)
 
 
 class ClassificationResult(BaseModel):
@@ -10,6 +11,10 @@ class ClassificationResult(BaseModel):
     confidence: float
     reasoning: str
     latency: str
+    model: str | None = None
+    escalated: bool | None = None
+    calibratedConfidence: float | None = None
+    taxonomyVersion: str | None = None
 
 
 class TraditionalNLPResult(BaseModel):
@@ -45,3 +50,55 @@ class HealthResponse(BaseModel):
     environment: dict
     timestamp: str
     error: str | None = None
+
+
+class ModelProfileInfo(BaseModel):
+    model: str
+    latencyMs: int | None = None
+    errorRate: float
+    expectedCostUsd: float | None = None
+    totalCostUsd: float
+    requests: int
+    errors: int
+
+
+class ModelRoutingResponse(BaseModel):
+    policy: str
+    latencySloMs: float
+    profiles: list[ModelProfileInfo]
+    stickyAssignments: dict[str, str]
+
+
+class CascadeIntentStats(BaseModel):
+    requests: int
+    escalations: int
+    escalationRate: float
+    avgLatencyMs: int
+    avgCheapLatencyMs: int
+    avgEscalatedLatencyMs: int
+
+
+class CascadeResponse(BaseModel):
+    enabled: bool
+    defaultThreshold: float | None = None
+    thresholds: dict[str, float] = {}
+    highRiskIntents: list[str] = []
+    overall: CascadeIntentStats | None = None
+    intents: dict[str, CascadeIntentStats] = {}
+
+
+class DeadlineStatsResponse(BaseModel):
+    requestsWithDeadline: int
+    budgetFallbacks: int
+    escalationsSkipped: int
+    upstreamTimeouts: int
+    upstreamCancelled: int
+    lateResponses: int
+    wastedUpstreamMs: int
+
+
+class TaxonomyResponse(BaseModel):
+    version: str
+    fingerprint: str
+    intents: dict[str, str]
+    reloaded: bool | None = None
@@ -0,0 +1,259 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from config import settings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+POLICY_CHEAPEST_WITHIN_SLO = "cheapest_within_slo"
+POLICY_FASTEST = "fastest"
+POLICY_STICKY_INTENT = "sticky_intent"
+
+ROUTING_POLICIES = (POLICY_CHEAPEST_WITHIN_SLO, POLICY_FASTEST, POLICY_STICKY_INTENT)
+
+# Typical classification request size, used to estimate cost before any usage is seen
+_ESTIMATED_PROMPT_TOKENS = 600
+_ESTIMATED_COMPLETION_TOKENS = 60
+
+
+@dataclass
+class ModelProfile:
+    """Live latency, error and cost profile for a single model"""
+
+    model: str
+    prompt_price: float  # USD per 1M prompt tokens
+    completion_price: float  # USD per 1M completion tokens
+    priced: bool = True  # False when the model has no MODEL_PRICING entry
+    latency_ms: float | None = None  # EWMA
+    error_rate: float = 0.0  # EWMA
+    cost_usd: float | None = None  # EWMA per request
+    requests: int = 0
+    errors: int = 0
+    total_cost_usd: float = 0.0
+    last_observed: float = 0.0
+
+    def expected_cost(self) -> float | None:
+        if not self.priced:
+            return None
+        if self.cost_usd is not None:
+            return self.cost_usd
+        return (
+            _ESTIMATED_PROMPT_TOKENS * self.prompt_price
+            + _ESTIMATED_COMPLETION_TOKENS * self.completion_price
+        ) / 1_000_000
+
+    def is_healthy(self, latency_slo_ms: float, max_error_rate: float) -> bool:
+        # Unobserved models are treated optimistically so they get tried
+        if self.latency_ms is not None and self.latency_ms > latency_slo_ms:
+            return False
+        return self.error_rate <= max_error_rate
+
+    def to_dict(self) -> dict:
+        return {
+            "model": self.model,
+            "latencyMs": round(self.latency_ms)
+            if self.latency_ms is not None
+            else None,
+            "errorRate": round(self.error_rate, 4),
+            "expectedCostUsd": round(self.expected_cost(), 8) if self.priced else None,
+            "totalCostUsd": round(self.total_cost_usd, 6),
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class ModelRouter:
+    """Route LLM requests across configured models using live performance profiles"""
+
+    def __init__(
+        self,
+        models: list[str] | None = None,
+        policy: str | None = None,
+        latency_slo_ms: float | None = None,
+    ):
+        self.policy = policy or settings.ROUTING_POLICY
+        if self.policy not in ROUTING_POLICIES:
+            raise ValueError(
+                f"Unknown routing policy '{self.policy}', expected one of {ROUTING_POLICIES}"
+            )
+        self.latency_slo_ms = latency_slo_ms or settings.LATENCY_SLO_MS
+        self.max_error_rate = settings.ROUTER_MAX_ERROR_RATE
+        self.alpha = settings.ROUTER_EWMA_ALPHA
+        self.probe_interval = settings.ROUTER_PROBE_INTERVAL_SECONDS
+
+        self._lock = threading.Lock()
+        self._profiles: dict[str, ModelProfile] = {}
+        for model in models or settings.OPENROUTER_MODELS:
+            pricing = settings.MODEL_PRICING.get(model)
+            if pricing is None:
+                # Unpriced models would look free and win every cost comparison
+                logger.warning(
+                    "Model has no MODEL_PRICING entry, excluded from cost ranking",
+                    model=model,
+                )
+            prompt_price, completion_price = pricing or (0.0, 0.0)
+            self._profiles[model] = ModelProfile(
+                model=model,
+                prompt_price=prompt_price,
+                completion_price=completion_price,
+                priced=pricing is not None,
+            )
+        if not self._profiles:
+            raise ValueError("ModelRouter requires at least one model")
+        self._sticky: dict[str, str] = {}
+
+    def choose(self, family: str | None = None, budget_ms: float | None = None) -> str:
+        """Pick the model for the next request under the configured policy
+
+        With a ``budget_ms``, models whose observed latency exceeds the remaining
+        request budget are avoided whenever another candidate fits.
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            profiles = list(self._profiles.values())
+            healthy = [
+                p
+                for p in profiles
+                if p.is_healthy(self.latency_slo_ms, self.max_error_rate)
+            ]
+
+            # Periodically probe unhealthy models that have fallen out of rotation
+            # so a recovered provider can win traffic back. Deadline-bound
+            # requests are never used as probes.
+            if budget_ms is None:
+                for profile in profiles:
+                    if (
+                        profile not in healthy
+                        and now - profile.last_observed > self.probe_interval
+                    ):
+                        profile.last_observed = now
+                        return profile.model
+            candidates = healthy or profiles
+            if budget_ms is not None:
+                candidates = [
+                    p
+                    for p in candidates
+                    if p.latency_ms is None or p.latency_ms <= budget_ms
+                ] or candidates
+
+            if self.policy == POLICY_FASTEST:
+                return min(candidates, key=self._latency_key).model
+
+            if self.policy == POLICY_STICKY_INTENT and family:
+                pinned = self._profiles.get(self._sticky.get(family, ""))
+                if pinned is not None and pinned in healthy:
+                    if pinned in candidates:
+                        return pinned.model
+                    # Too slow for this request's budget only; keep the pin
+                    return min(candidates, key=self._cost_key).model
+                chosen = min(candidates, key=self._cost_key)
+                self._sticky[family] = chosen.model
+                return chosen.model
+
+            return min(candidates, key=self._cost_key).model
+
+    def record(
+        self,
+        model: str,
+        latency_ms: float,
+        usage: object | None = None,
+        error: bool = False,
+    ) -> None:
+        """Fold the outcome of a request into the model's profile"""
+        with self._lock:
+            profile = self._profiles.get(model)
+            if profile is None:
+                return
+
+            profile.requests += 1
+            profile.last_observed = time.monotonic()
+            profile.latency_ms = self._ewma(profile.latency_ms, latency_ms)
+            profile.error_rate = self._ewma(profile.error_rate, 1.0 if error else 0.0)
+
+            if error:
+                profile.errors += 1
+                return
+
+            if usage is not None:
+                cost = (
+                    getattr(usage, "prompt_tokens", 0) * profile.prompt_price
+                    + getattr(usage, "completion_tokens", 0) * profile.completion_price
+                ) / 1_000_000
+                profile.total_cost_usd += cost
+                profile.cost_usd = self._ewma(profile.cost_usd, cost)
+
+    def record_cutoff(self, model: str, elapsed_ms: float) -> None:
+        """Fold a call that the caller's own deadline cut short into the profile
+
+        The elapsed time is only a lower bound on the model's latency, so it can
+        raise the estimate but never lower it, and the cut-off is not an error.
+        """
+        with self._lock:
+            profile = self._profiles.get(model)
+            if profile is None:
+                return
+
+            profile.requests += 1
+            profile.last_observed = time.monotonic()
+            sample = max(elapsed_ms, profile.latency_ms or 0.0)
+            profile.latency_ms = self._ewma(profile.latency_ms, sample)
+
+    def probe(self, budget_ms: float, claim: bool = True) -> str | None:
+        """Claim a model too slow or unhealthy for ``budget_ms`` that is due a probe
+
+        Used when no model fits a request's budget, so that deadline-bound traffic
+        still refreshes stale profiles and a recovered provider can win it back.
+        With ``claim=False`` the probe slot is only checked, not taken.
+        """
+        with self._lock:
+            now = time.monotonic()
+            due = [
+                p
+                for p in self._profiles.values()
+                if now - p.last_observed > self.probe_interval
+                and (
+                    (p.latency_ms is not None and p.latency_ms > budget_ms)
+                    or not p.is_healthy(self.latency_slo_ms, self.max_error_rate)
+                )
+            ]
+            if not due:
+                return None
+            profile = min(due, key=self._latency_key)
+            if claim:
+                profile.last_observed = now
+            return profile.model
+
+    def fastest_latency_ms(self) -> float:
+        """Lowest expected latency across models, 0 while any model is unobserved"""
+        with self._lock:
+            latencies = [p.latency_ms for p in self._profiles.values()]
+        if any(latency is None for latency in latencies):
+            return 0.0
+        return min(latencies)
+
+    def profiles(self) -> list[dict]:
+        with self._lock:
+            return [profile.to_dict() for profile in self._profiles.values()]
+
+    def sticky_assignments(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._sticky)
+
+    def _ewma(self, current: float | None, sample: float) -> float:
+        if current is None:
+            return sample
+        return self.alpha * sample + (1 - self.alpha) * current
+
+    @staticmethod
+    def _latency_key(profile: ModelProfile) -> tuple:
+        latency = profile.latency_ms if profile.latency_ms is not None else 0.0
+        return (latency, not profile.priced, profile.expected_cost() or 0.0)
+
+    @staticmethod
+    def _cost_key(profile: ModelProfile) -> tuple:
+        # Unpriced models rank after every priced one, then by latency
+        latency = profile.latency_ms if profile.latency_ms is not None else 0.0
+        return (not profile.priced, profile.expected_cost() or 0.0, latency)
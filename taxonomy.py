@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from config import settings
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Intent the classifier falls back to, so every taxonomy must define it
+FALLBACK_INTENT = "insufficient_context"
+
+
+class TaxonomyError(Exception):
+    """Raised when a taxonomy file is missing or invalid"""
+
+
+@dataclass(frozen=True)
+class Taxonomy:
+    """Immutable snapshot of the intent taxonomy and everything derived from it"""
+
+    version: str
+    fingerprint: str
+    intents: dict[str, str]
+    system_prompt: str = field(repr=False)
+
+
+def _build_system_prompt(intents: dict[str, str]) -> str:
+    return f"""You are an expert intent classifier for Hong Kong bank customer service.
+
+Classify customer inquiries into these intents:
+{json.dumps(intents, indent=2)}
+
+Respond ONLY with valid JSON in this exact format:
+{{
+  "intent": "intent_key",
+  "confidence": 0.85,
+  "reasoning": "Brief explanation"
+}}"""
+
+
+def load_taxonomy(path: str | None = None) -> Taxonomy:
+    """Read and validate a versioned taxonomy file and build its derived artefacts"""
+    path = path or settings.TAXONOMY_PATH
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+    except (OSError, ValueError) as error:
+        raise TaxonomyError(f"Cannot read taxonomy {path}: {error}") from error
+
+    version = data.get("version")
+    intents = data.get("intents")
+    if not version or not isinstance(intents, dict) or not intents:
+        raise TaxonomyError(
+            f"Taxonomy {path} needs a 'version' and non-empty 'intents'"
+        )
+    if not all(isinstance(v, str) for v in intents.values()):
+        raise TaxonomyError(f"Taxonomy {path} intent descriptions must be strings")
+    if FALLBACK_INTENT not in intents:
+        raise TaxonomyError(f"Taxonomy {path} must define '{FALLBACK_INTENT}'")
+
+    return Taxonomy(
+        version=str(version),
+        fingerprint=hashlib.sha256(raw).hexdigest()[:12],
+        intents=intents,
+        system_prompt=_build_system_prompt(intents),
+    )
+
+
+class TaxonomyStore:
+    """Holds the live taxonomy and swaps in new versions without a restart
+
+    Readers take a snapshot with ``current()`` once per request, so a reload
+    never changes the taxonomy under an in-flight classification.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.TAXONOMY_PATH
+        self._current = load_taxonomy(self.path)
+        self._mtime = self._stat_mtime()
+        self._reload_lock = threading.Lock()
+        self._watcher: threading.Thread | None = None
+
+    def current(self) -> Taxonomy:
+        return self._current
+
+    def reload(self) -> tuple[Taxonomy, bool]:
+        """Rebuild from disk and swap atomically; returns (taxonomy, changed)"""
+        with self._reload_lock:
+            # Record the mtime first so a broken file is reported once, not every poll
+            self._mtime = self._stat_mtime()
+            taxonomy = load_taxonomy(self.path)
+
+            previous = self._current
+            if taxonomy.fingerprint == previous.fingerprint:
+                return previous, False
+            # The version on results must identify the prompt that produced them
+            if taxonomy.version == previous.version:
+                raise TaxonomyError(
+                    f"Taxonomy {self.path} changed without a version bump "
+                    f"(still '{taxonomy.version}')"
+                )
+
+            # Single reference assignment: readers see either the old or new snapshot
+            self._current = taxonomy
+            logger.info(
+                "Taxonomy reloaded",
+                previous_version=previous.version,
+                version=taxonomy.version,
+                intents=len(taxonomy.intents),
+            )
+            return taxonomy, True
+
+    def watch(self, interval: float | None = None) -> None:
+        """Poll the taxonomy file in a background thread and reload on change"""
+        if self._watcher is not None:
+            return
+        interval = interval or settings.TAXONOMY_POLL_SECONDS
+
+        def poll() -> None:
+            while True:
+                time.sleep(interval)
+                if self._stat_mtime() == self._mtime:
+                    continue
+                try:
+                    self.reload()
+                except TaxonomyError as error:
+                    logger.error("Taxonomy reload failed", error=str(error))
+
+        self._watcher = threading.Thread(
+            target=poll, name="taxonomy-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def _stat_mtime(self) -> float:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return 0.0
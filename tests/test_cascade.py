@@ -0,0 +1,140 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from cascade import CascadePolicy, CascadeStats, ConfidenceCalibrator, tune_thresholds
+from classifier import IntentClassifier
+from config import settings
+from router import ModelRouter
+
+CHEAP = "openai/gpt-4o-mini"
+STRONG = "anthropic/claude-3.5-sonnet"
+
+
+def records(intent, samples):
+    return [
+        {"intent": intent, "confidence": confidence, "correct": correct}
+        for confidence, correct in samples
+    ]
+
+
+def test_calibrator_maps_bins_to_smoothed_accuracy():
+    calibrator = ConfidenceCalibrator.fit(
+        records("a", [(0.9, True), (0.95, True), (0.85, False)])
+    )
+    assert calibrator.calibrate(0.9) == pytest.approx(3 / 5)
+    # Empty bins pass the raw confidence through
+    assert calibrator.calibrate(0.1) == 0.1
+
+
+def test_tune_thresholds_picks_lowest_confidence_meeting_precision():
+    samples = records("a", [(0.95, True), (0.9, True), (0.5, False)])
+    identity = ConfidenceCalibrator()
+    assert tune_thresholds(samples, identity, target_precision=0.9) == {"a": 0.9}
+
+
+def test_tune_thresholds_judges_equal_confidences_as_one_group():
+    # Binning gives all 15 samples the same calibrated confidence; accepting that
+    # value means accepting 9 correct and 6 wrong, i.e. precision 0.6
+    samples = records("a", [(0.9, True)] * 9 + [(0.9, False)] * 6)
+    calibrator = ConfidenceCalibrator.fit(samples)
+    assert tune_thresholds(samples, calibrator, target_precision=0.9) == {"a": 1.01}
+
+
+def test_tuned_threshold_accepts_its_own_bin():
+    samples = records("a", [(0.9, True), (0.1, False)])
+    calibrator = ConfidenceCalibrator.fit(samples)
+    thresholds = tune_thresholds(samples, calibrator, target_precision=0.7)
+    policy = CascadePolicy(thresholds=thresholds, calibrator=calibrator)
+    # Calibrated confidence is 2/3; rounding the threshold up to 0.6667 would
+    # escalate the bin it was tuned to accept
+    assert not policy.should_escalate("a", policy.calibrate(0.9))
+    assert policy.should_escalate("a", policy.calibrate(0.1))
+
+
+def test_high_risk_intents_always_escalate():
+    policy = CascadePolicy(high_risk_intents={"fraud_verification_urgent"})
+    assert policy.should_escalate("fraud_verification_urgent", 0.99)
+    assert not policy.should_escalate("mpf_consolidation", 0.99)
+
+
+def test_load_reads_thresholds_and_calibration(tmp_path):
+    path = tmp_path / "thresholds.json"
+    path.write_text(
+        json.dumps(
+            {
+                "thresholds": {"a": 0.8},
+                "calibration_bins": [[0, 0], [0, 0], [0, 0], [0, 0], [3, 4]],
+            }
+        )
+    )
+    policy = CascadePolicy.load(str(path))
+    assert policy.threshold("a") == 0.8
+    assert policy.calibrate(0.9) == pytest.approx(4 / 6)
+
+
+def test_load_falls_back_to_defaults_without_file(tmp_path):
+    policy = CascadePolicy.load(str(tmp_path / "missing.json"))
+    assert policy.thresholds == {}
+
+
+def test_stats_report_escalation_rate_and_latency():
+    stats = CascadeStats()
+    stats.record("a", escalated=True, latency_ms=900)
+    stats.record("a", escalated=False, latency_ms=300)
+    overall = stats.snapshot()["overall"]
+    assert overall["escalationRate"] == 0.5
+    assert overall["avgCheapLatencyMs"] == 300
+    assert overall["avgEscalatedLatencyMs"] == 900
+
+
+def make_cascade_classifier(monkeypatch, answers):
+    """Classifier whose models answer with the given (intent, confidence) by model"""
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", "sk-or-v1-test")
+    classifier = IntentClassifier(cascade=False)
+    classifier.router = ModelRouter(models=[CHEAP])
+    classifier.strong_router = ModelRouter(models=[STRONG])
+    classifier.cascade = CascadePolicy(
+        calibrator=ConfidenceCalibrator([(0, 0)] * 4 + [(1, 4)]),
+        default_threshold=0.3,
+        high_risk_intents=set(),
+    )
+
+    async def create(model, **kwargs):
+        intent, confidence = answers[model]
+        content = json.dumps({"intent": intent, "confidence": confidence})
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=None,
+        )
+
+    classifier.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    return classifier
+
+
+def test_cascade_returns_calibrated_confidence_of_cheap_answer(monkeypatch):
+    classifier = make_cascade_classifier(
+        monkeypatch, {CHEAP: ("mpf_consolidation", 0.9)}
+    )
+    result = asyncio.run(classifier.classify_with_llm("MPF"))
+    assert not result.escalated
+    assert result.confidence == 0.9
+    assert result.calibratedConfidence == pytest.approx(2 / 6)
+    assert result.taxonomyVersion == classifier.taxonomy.current().version
+
+
+def test_cascade_stats_are_keyed_on_cheap_intent(monkeypatch):
+    classifier = make_cascade_classifier(
+        monkeypatch,
+        {CHEAP: ("mpf_consolidation", 0.1), STRONG: ("card_issue", 0.95)},
+    )
+    result = asyncio.run(classifier.classify_with_llm("MPF"))
+    assert result.escalated
+    assert result.intent == "card_issue"
+    assert result.calibratedConfidence is None
+    intents = classifier.cascade.stats.snapshot()["intents"]
+    assert list(intents) == ["mpf_consolidation"]
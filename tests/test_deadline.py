@@ -0,0 +1,133 @@
+import asyncio
+import math
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError
+
+from classifier import IntentClassifier
+from config import settings
+from deadline import Deadline
+from router import ModelRouter
+
+MODEL = "openai/gpt-4o-mini"
+
+
+def test_from_request_keeps_tighter_budget():
+    assert Deadline.from_request("500", 800).budget_ms == 500
+    assert Deadline.from_request(None, 300).budget_ms == 300
+
+
+def test_from_request_without_budget_returns_none():
+    assert Deadline.from_request(None, None) is None
+    assert Deadline.from_request("", None) is None
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "-1", "soon"])
+def test_from_request_rejects_invalid_header(value):
+    with pytest.raises(ValueError):
+        Deadline.from_request(value, None)
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -5.0])
+def test_from_request_rejects_invalid_field(value):
+    with pytest.raises(ValueError):
+        Deadline.from_request(None, value)
+
+
+def test_remaining_budget_counts_down():
+    deadline = Deadline(0)
+    assert deadline.expired()
+    assert deadline.remaining_ms() == 0
+
+
+def test_router_probe_claims_slow_model_once_per_interval():
+    router = ModelRouter(models=[MODEL])
+    router.record(MODEL, 1200)
+    router.probe_interval = 0
+    assert router.probe(800, claim=False) == MODEL
+    assert router.probe(800) == MODEL
+    router.probe_interval = 60
+    assert router.probe(800) is None
+
+
+def test_fastest_latency_is_zero_while_a_model_is_unobserved():
+    router = ModelRouter(models=[MODEL, "anthropic/claude-3-haiku"])
+    router.record(MODEL, 1200)
+    assert router.fastest_latency_ms() == 0
+
+
+class FakeCompletions:
+    def __init__(self, error=None, delay=0.0):
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        message = SimpleNamespace(
+            content='{"intent": "mpf_consolidation", "confidence": 0.9}'
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=600, completion_tokens=40),
+        )
+
+
+def make_classifier(monkeypatch, completions):
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", "sk-or-v1-test")
+    classifier = IntentClassifier(cascade=False)
+    classifier.router = ModelRouter(models=[MODEL])
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    fake.with_options = lambda **kwargs: fake
+    classifier.client = fake
+    return classifier
+
+
+def test_deadline_cutoff_is_enforced_and_not_counted_as_model_error(monkeypatch):
+    monkeypatch.setattr(settings, "MIN_LLM_BUDGET_MS", 0)
+    completions = FakeCompletions(delay=5)
+    classifier = make_classifier(monkeypatch, completions)
+    classifier.router.record(MODEL, 20)
+
+    result = asyncio.run(classifier.classify_with_llm("MPF", deadline=Deadline(50)))
+
+    assert result.model is None
+    assert int(result.latency) < 1000
+    profile = classifier.router.profiles()[0]
+    assert profile["errors"] == 0
+    assert profile["errorRate"] == 0
+    # The cut-off is a lower bound, so it can only raise the latency estimate
+    assert profile["latencyMs"] > 20
+    assert classifier.deadline_stats.snapshot()["upstreamTimeouts"] == 1
+
+
+def test_provider_failure_is_counted_as_model_error(monkeypatch):
+    error = APIConnectionError(request=httpx.Request("POST", "https://example.test"))
+    classifier = make_classifier(monkeypatch, FakeCompletions(error=error))
+
+    asyncio.run(classifier.classify_with_llm("MPF", deadline=Deadline(5000)))
+
+    assert classifier.router.profiles()[0]["errors"] == 1
+    assert classifier.deadline_stats.snapshot()["upstreamTimeouts"] == 0
+
+
+def test_deadline_requests_probe_when_every_model_is_too_slow(monkeypatch):
+    completions = FakeCompletions()
+    classifier = make_classifier(monkeypatch, completions)
+    classifier.router.record(MODEL, 1200)
+
+    # Not due a probe yet: straight to the fallback without an upstream call
+    asyncio.run(classifier.classify_with_llm("MPF", deadline=Deadline(800)))
+    assert completions.calls == 0
+    assert classifier.deadline_stats.snapshot()["budgetFallbacks"] == 1
+
+    classifier.router.probe_interval = 0
+    result = asyncio.run(classifier.classify_with_llm("MPF", deadline=Deadline(800)))
+    assert completions.calls == 1
+    assert result.model == MODEL
+    assert classifier.router.profiles()[0]["latencyMs"] < 1200
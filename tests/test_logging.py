@@ -0,0 +1,113 @@
+import asyncio
+import io
+import logging
+import queue
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import structlog
+from openai import APIConnectionError
+from structlog.testing import capture_logs
+
+import logging_config
+from classifier import IntentClassifier
+from config import settings
+from logging_config import (
+    QueueLogger,
+    _LogWriter,
+    _queue_handlers,
+    configure_logging,
+    get_logger,
+    sample_events,
+)
+
+
+def render_event(_, __, event_dict):
+    return f"{event_dict['event']} {event_dict.get('dropped', '')}".strip()
+
+
+def test_writer_drains_queue_in_order(capsys):
+    writer = _LogWriter(queue.Queue(10), render_event)
+    writer.start()
+    log = QueueLogger(writer)
+    log.info(event="first")
+    log.info(event="second")
+    writer.stop()
+    assert capsys.readouterr().out.splitlines() == ["first", "second"]
+
+
+def test_full_queue_drops_and_reports_count(capsys):
+    writer = _LogWriter(queue.Queue(1), render_event)
+    log = QueueLogger(writer)
+    for i in range(3):
+        log.info(event=f"event {i}")
+    assert writer.dropped == 2
+
+    writer.start()
+    writer.stop()
+    assert capsys.readouterr().out.splitlines() == ["event 0", "Log events dropped 2"]
+
+
+def test_sample_events_drops_only_sampled_info_and_debug(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "LOG_SAMPLED_EVENTS", {"noisy"})
+
+    for method_name in ("debug", "info"):
+        with pytest.raises(structlog.DropEvent):
+            sample_events(None, method_name, {"event": "noisy"})
+    assert sample_events(None, "warning", {"event": "noisy"}) == {"event": "noisy"}
+    assert sample_events(None, "info", {"event": "other"}) == {"event": "other"}
+
+
+def test_queued_stdlib_logger_keeps_its_formatter():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    logger = logging.getLogger("tests.access")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    writer = _LogWriter(queue.Queue(10), render_event)
+
+    _queue_handlers(logger, writer)
+    logger.info('"%s %s" %d', "GET", "/health", 200)
+    logging_config._listeners.pop().stop()
+
+    assert not isinstance(logger.handlers[0], logging.StreamHandler)
+    assert stream.getvalue() == 'INFO "GET /health" 200\n'
+
+
+def test_async_mode_keeps_tracebacks(monkeypatch, capsys):
+    monkeypatch.setattr(logging_config, "_writer", None)
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+    try:
+        configure_logging(async_mode=True)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            get_logger("tests").exception("Failed")
+        logging_config._writer.stop()
+    finally:
+        structlog.reset_defaults()
+    assert "ValueError: boom" in capsys.readouterr().out
+
+
+def test_classifier_errors_are_logged_not_printed(monkeypatch, capsys):
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", "sk-or-v1-test")
+    classifier = IntentClassifier(cascade=False)
+
+    async def create(**kwargs):
+        raise APIConnectionError(request=httpx.Request("POST", "https://x.test"))
+
+    classifier.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    with capture_logs() as logs:
+        asyncio.run(classifier.classify_with_llm("MPF"))
+
+    assert [log["event"] for log in logs] == ["LLM API error"]
+    assert logs[0]["log_level"] == "error"
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+
+import pytest
+
+from router import (
+    POLICY_CHEAPEST_WITHIN_SLO,
+    POLICY_FASTEST,
+    POLICY_STICKY_INTENT,
+    ModelRouter,
+)
+
+CHEAP = "openai/gpt-4o-mini"
+PRICEY = "anthropic/claude-3.5-sonnet"
+
+
+def make_router(policy=POLICY_CHEAPEST_WITHIN_SLO, models=(CHEAP, PRICEY)):
+    return ModelRouter(models=list(models), policy=policy, latency_slo_ms=1000)
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        make_router(policy="random")
+
+
+def test_cheapest_within_slo_prefers_cheaper_model():
+    router = make_router()
+    assert router.choose() == CHEAP
+
+
+def test_cheapest_within_slo_moves_away_from_slow_model():
+    router = make_router()
+    router.record(CHEAP, 3000)
+    assert router.choose() == PRICEY
+
+
+def test_fastest_policy_picks_lowest_latency():
+    router = make_router(policy=POLICY_FASTEST)
+    router.record(CHEAP, 800)
+    router.record(PRICEY, 200)
+    assert router.choose() == PRICEY
+
+
+def test_sticky_policy_pins_family_until_model_degrades():
+    router = make_router(policy=POLICY_STICKY_INTENT)
+    assert router.choose("payment") == CHEAP
+    assert router.sticky_assignments() == {"payment": CHEAP}
+
+    router.record(CHEAP, 3000)
+    assert router.choose("payment") == PRICEY
+    assert router.sticky_assignments() == {"payment": PRICEY}
+
+
+def test_sticky_policy_avoids_pinned_model_too_slow_for_budget():
+    router = make_router(policy=POLICY_STICKY_INTENT, models=(PRICEY, CHEAP))
+    router.record(PRICEY, 900)
+    router.record(CHEAP, 300)
+    router._sticky["payment"] = PRICEY
+    assert router.choose("payment", budget_ms=800) == CHEAP
+    # The pin still holds for requests the pinned model can serve
+    assert router.sticky_assignments() == {"payment": PRICEY}
+    assert router.choose("payment") == PRICEY
+
+
+def test_cutoff_only_raises_latency_and_is_not_an_error():
+    router = make_router()
+    router.record(CHEAP, 700)
+    router.record_cutoff(CHEAP, 500)
+    profile = {p["model"]: p for p in router.profiles()}[CHEAP]
+    assert profile["latencyMs"] == 700
+    assert profile["errors"] == 0
+    assert profile["errorRate"] == 0
+    router.record_cutoff(CHEAP, 900)
+    assert {p["model"]: p for p in router.profiles()}[CHEAP]["latencyMs"] > 700
+
+
+def test_errors_mark_model_unhealthy():
+    router = make_router()
+    for _ in range(3):
+        router.record(CHEAP, 100, error=True)
+    profile = {p["model"]: p for p in router.profiles()}[CHEAP]
+    assert profile["errors"] == 3
+    assert profile["errorRate"] > router.max_error_rate
+    assert router.choose() == PRICEY
+
+
+def test_record_tracks_cost_from_usage():
+    router = make_router()
+    router.record(
+        CHEAP, 100, usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=0)
+    )
+    profile = {p["model"]: p for p in router.profiles()}[CHEAP]
+    assert profile["requests"] == 1
+    assert profile["totalCostUsd"] == pytest.approx(0.00015)
+
+
+def test_record_ignores_unknown_model():
+    router = make_router()
+    router.record("unknown/model", 100)
+    assert all(p["requests"] == 0 for p in router.profiles())
+
+
+def test_idle_healthy_models_are_not_probed():
+    router = make_router()
+    router.record(PRICEY, 100)
+    router.probe_interval = 0
+    assert router.choose() == CHEAP
+
+
+def test_idle_unhealthy_model_is_probed():
+    router = make_router()
+    router.record(CHEAP, 3000)
+    router.probe_interval = 0
+    assert router.choose() == CHEAP
+    # The probe claims the slot, so the next request follows the policy again
+    router.probe_interval = 60
+    assert router.choose() == PRICEY
+
+
+def test_unpriced_model_is_ranked_after_priced_models():
+    router = make_router(models=("unpriced/model", PRICEY))
+    assert router.choose() == PRICEY
+    profile = {p["model"]: p for p in router.profiles()}["unpriced/model"]
+    assert profile["expectedCostUsd"] is None
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from taxonomy import FALLBACK_INTENT, TaxonomyError, TaxonomyStore, load_taxonomy
+
+INTENTS = {
+    "mpf_consolidation": "Mandatory Provident Fund scheme transfers",
+    FALLBACK_INTENT: "Query too vague or lacks sufficient context for classification",
+}
+
+
+def write_taxonomy(path, version, intents=INTENTS):
+    path.write_text(json.dumps({"version": version, "intents": intents}))
+
+
+@pytest.fixture
+def taxonomy_path(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    write_taxonomy(path, "1")
+    return path
+
+
+def test_load_builds_prompt_from_intents(taxonomy_path):
+    taxonomy = load_taxonomy(str(taxonomy_path))
+    assert taxonomy.version == "1"
+    assert "mpf_consolidation" in taxonomy.system_prompt
+
+
+def test_load_requires_fallback_intent(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    write_taxonomy(path, "1", {"mpf_consolidation": "MPF"})
+    with pytest.raises(TaxonomyError):
+        load_taxonomy(str(path))
+
+
+def test_load_rejects_invalid_json(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    path.write_text("{")
+    with pytest.raises(TaxonomyError):
+        load_taxonomy(str(path))
+
+
+def test_reload_without_changes_keeps_snapshot(taxonomy_path):
+    store = TaxonomyStore(str(taxonomy_path))
+    before = store.current()
+    taxonomy, changed = store.reload()
+    assert not changed
+    assert taxonomy is before
+
+
+def test_reload_swaps_in_new_version(taxonomy_path):
+    store = TaxonomyStore(str(taxonomy_path))
+    in_flight = store.current()
+
+    write_taxonomy(taxonomy_path, "2", {**INTENTS, "debit_card_application": "ATM"})
+    taxonomy, changed = store.reload()
+
+    assert changed
+    assert store.current() is taxonomy
+    assert taxonomy.version == "2"
+    # Snapshots already handed out are untouched
+    assert in_flight.version == "1"
+    assert "debit_card_application" not in in_flight.intents
+
+
+def test_reload_rejects_content_change_without_version_bump(taxonomy_path):
+    store = TaxonomyStore(str(taxonomy_path))
+    write_taxonomy(taxonomy_path, "1", {**INTENTS, "debit_card_application": "ATM"})
+    with pytest.raises(TaxonomyError):
+        store.reload()
+    assert "debit_card_application" not in store.current().intents
+
+
+def test_reload_keeps_current_version_on_invalid_file(taxonomy_path):
+    store = TaxonomyStore(str(taxonomy_path))
+    write_taxonomy(taxonomy_path, "2", {"mpf_consolidation": "MPF"})
+    with pytest.raises(TaxonomyError):
+        store.reload()
+    assert store.current().version == "1"